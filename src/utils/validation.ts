@@ -3,6 +3,13 @@
  * Following compliance standards from APM dependencies
  */
 
+// Validation patterns are created once at module load rather than on every call.
+// Dangerous patterns are single alternations so each check scans the input once.
+const EMAIL_REGEX = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+const EMAIL_DANGEROUS_PATTERN = /javascript:|<script|data:|vbscript:/i;
+const PHONE_REGEX = /^\+\d{7,15}$/;
+const URL_DANGEROUS_PATTERN = /javascript:|data:|vbscript:|file:/i;
+
 /**
  * Sanitize user input to prevent XSS attacks
  */
@@ -27,8 +34,7 @@ export function validateEmail(email: string): boolean {
   }
   
   // Basic format check
-  const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
-  if (!emailRegex.test(email)) {
+  if (!EMAIL_REGEX.test(email)) {
     return false;
   }
   
@@ -38,14 +44,7 @@ export function validateEmail(email: string): boolean {
   }
   
   // Check for dangerous patterns
-  const dangerousPatterns = [
-    /javascript:/i,
-    /<script/i,
-    /data:/i,
-    /vbscript:/i
-  ];
-  
-  return !dangerousPatterns.some(pattern => pattern.test(email));
+  return !EMAIL_DANGEROUS_PATTERN.test(email);
 }
 
 /**
@@ -142,8 +141,7 @@ export function validatePhoneNumber(phone: string): boolean {
   const cleaned = phone.replace(/[^\d+]/g, '');
   
   // Check basic format: + followed by 7-15 digits
-  const phoneRegex = /^\+\d{7,15}$/;
-  return phoneRegex.test(cleaned);
+  return PHONE_REGEX.test(cleaned);
 }
 
 /**
@@ -163,14 +161,7 @@ export function validateURL(url: string): boolean {
     }
     
     // Check for dangerous patterns
-    const dangerousPatterns = [
-      /javascript:/i,
-      /data:/i,
-      /vbscript:/i,
-      /file:/i
-    ];
-    
-    return !dangerousPatterns.some(pattern => pattern.test(url));
+    return !URL_DANGEROUS_PATTERN.test(url);
   } catch {
     return false;
   }
@@ -0,0 +1,19 @@
+"""
+Shared fixtures for the server test suite
+"""
+
+import importlib
+import os
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def contact_handler(tmp_path_factory):
+    """Import the handler module from a scratch directory so its audit.log stays out of the repo"""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('audit'))
+    try:
+        return importlib.import_module('server.contact_handler')
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,283 @@
+"""
+Test suite for the buffered audit log writer
+Following compliance and audit requirements
+"""
+
+import gc
+import io
+import json
+import os
+import subprocess
+import sys
+import uuid
+import weakref
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def audit_file(tmp_path):
+    """Append-only audit file and its descriptor"""
+    path = tmp_path / 'audit.log'
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    yield path, fd
+    os.close(fd)
+
+
+@pytest.fixture
+def broken_pipe_fd():
+    """Write end of a pipe whose reader is gone, so every write fails"""
+    read_fd, write_fd = os.pipe()
+    os.close(read_fd)
+    yield write_fd
+    os.close(write_fd)
+
+
+class TestAuditLogWriter:
+    """Test suite for AuditLogWriter buffering and failure handling"""
+
+    def test_stop_flushes_partial_buffer(self, contact_handler, audit_file):
+        """Test that stop() writes data still sitting in the filling buffer"""
+        path, fd = audit_file
+        writer = contact_handler.AuditLogWriter([fd], flush_interval=60)
+        writer.start()
+
+        writer.write(b'first\n')
+        writer.stop()
+
+        assert path.read_bytes() == b'first\n'
+
+    def test_rotates_full_buffers_in_order(self, contact_handler, audit_file):
+        """Test that a full filling buffer is rotated out and written before the next"""
+        path, fd = audit_file
+        writer = contact_handler.AuditLogWriter([fd], buffer_size=8)
+
+        writer.write(b'aaaaaa\n')
+        writer.write(b'bbbbbb\n')
+        writer.write(b'cccccc\n')
+
+        assert len(writer._full) == 2
+
+        writer.start()
+        writer.stop()
+
+        assert path.read_bytes() == b'aaaaaa\nbbbbbb\ncccccc\n'
+        assert writer.dropped_records == 0
+
+    def test_drops_when_every_buffer_is_full(self, contact_handler, audit_file):
+        """Test that writes are dropped and counted instead of blocking"""
+        path, fd = audit_file
+        writer = contact_handler.AuditLogWriter([fd], buffer_count=2, buffer_size=8)
+
+        writer.write(b'aaaaaa\n')
+        writer.write(b'bbbbbb\n')
+        writer.write(b'cccccc\n')
+
+        writer.write(b'dd\nee\n', records=2)
+
+        writer.start()
+        writer.stop()
+
+        lines = path.read_bytes().splitlines()
+        summaries = [json.loads(line) for line in lines if line.startswith(b'{')]
+        assert [line for line in lines if not line.startswith(b'{')] == [b'aaaaaa', b'bbbbbb']
+        assert writer.dropped_records == 3
+        assert [s['event_type'] for s in summaries] == ['audit_records_dropped']
+        assert summaries[0]['event_data'] == {'dropped_records': 3}
+
+    @pytest.mark.parametrize('broken_first', [True, False])
+    def test_failing_fd_does_not_block_audit_file(self, contact_handler, audit_file,
+                                                  broken_pipe_fd, broken_first):
+        """Test that a failing target neither stops the writer nor the audit file"""
+        path, fd = audit_file
+        fds = [broken_pipe_fd, fd] if broken_first else [fd, broken_pipe_fd]
+        writer = contact_handler.AuditLogWriter(fds, buffer_size=8)
+
+        writer.write(b'first\n')
+        writer.write(b'second\n')
+        writer.start()
+        writer.stop()
+
+        assert path.read_bytes() == b'first\nsecond\n'
+        assert len(writer._empty) == writer.buffer_count - 1
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+    def test_forked_child_restarts_with_fresh_buffers(self, contact_handler, audit_file):
+        """Test that parent data is written once and a child gets its own writer"""
+        path, fd = audit_file
+        writer = contact_handler.AuditLogWriter([fd], flush_interval=60)
+        writer.start()
+        writer.write(b'parent\n')
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                writer.write(b'child\n')
+                writer.stop()
+            finally:
+                os._exit(0)
+
+        _, status = os.waitpid(pid, 0)
+        writer.stop()
+
+        assert os.waitstatus_to_exitcode(status) == 0
+        assert sorted(path.read_bytes().splitlines()) == [b'child', b'parent']
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+    def test_stopped_writer_stays_stopped_in_child(self, contact_handler, audit_file):
+        """Test that fork does not revive a writer that was stopped"""
+        _, fd = audit_file
+        writer = contact_handler.AuditLogWriter([fd])
+        writer.start()
+        writer.stop()
+
+        pid = os.fork()
+        if pid == 0:
+            try:
+                alive = writer._thread.is_alive()
+                writer.write(b'child\n')
+                writer.stop()
+                os._exit(1 if alive else 0)
+            finally:
+                os._exit(2)
+
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+
+    def test_fork_hooks_do_not_keep_writers_alive(self, contact_handler, audit_file):
+        """Test that a discarded writer is collected instead of pinned by fork hooks"""
+        _, fd = audit_file
+        writer = contact_handler.AuditLogWriter([fd])
+        ref = weakref.ref(writer)
+
+        del writer
+        gc.collect()
+
+        assert ref() is None
+
+    def test_console_output_goes_through_current_stderr(self, contact_handler,
+                                                        audit_file, monkeypatch):
+        """Test that console echo uses sys.stderr at flush time, not a saved fd"""
+        path, fd = audit_file
+        console = io.StringIO()
+        monkeypatch.setattr(sys, 'stderr', console)
+        writer = contact_handler.AuditLogWriter([fd], console=True)
+        writer.start()
+
+        writer.write(b'entry\n')
+        writer.stop()
+
+        assert console.getvalue() == 'entry\n'
+        assert path.read_bytes() == b'entry\n'
+
+    def test_import_without_stderr_fd(self, tmp_path):
+        """Test that the module imports when sys.stderr is not backed by an fd"""
+        result = subprocess.run(
+            [sys.executable, '-c',
+             'import io, sys; sys.stderr = io.StringIO(); import server.contact_handler'],
+            cwd=tmp_path,
+            env={**os.environ, 'PYTHONPATH': str(REPO_ROOT)},
+            capture_output=True
+        )
+
+        assert result.returncode == 0, result.stderr
+
+
+class TestEncodeJsonLine:
+    """Test suite for audit line encoding"""
+
+    def test_encodes_compact_line(self, contact_handler):
+        """Test that entries become one compact JSON line"""
+        line = contact_handler.encode_json_line({'event': 'submit', 'ok': True})
+
+        assert line.endswith(b'\n') and line.count(b'\n') == 1
+        assert json.loads(line) == {'event': 'submit', 'ok': True}
+
+    def test_lone_surrogate_falls_back_to_json(self, contact_handler):
+        """Test that input orjson rejects is still encoded instead of raising"""
+        line = contact_handler.encode_json_line({'message': 'bad \ud800 input'})
+
+        assert json.loads(line) == {'message': 'bad \ud800 input'}
+
+
+class TestSubmissionAuditing:
+    """Test suite for audit logging around contact form submissions"""
+
+    @pytest.fixture
+    def valid_form(self):
+        """Valid contact form submission"""
+        return {
+            'name': 'John Doe',
+            'email': 'john@example.com',
+            'message': 'Hello there',
+            'consent_given': True
+        }
+
+    def test_audit_failure_keeps_response(self, contact_handler, valid_form,
+                                          monkeypatch, capsys):
+        """Test that a failing audit write neither raises nor changes the result"""
+        def failing_bulk(entries):
+            raise RuntimeError('audit trail unavailable')
+
+        monkeypatch.setattr(contact_handler.AuditLogger, 'log_events_bulk', failing_bulk)
+        handler = contact_handler.ContactFormHandler()
+
+        result = handler.process_submission(
+            valid_form, '192.168.1.1', 'UA', 'a' * 32, 'session'
+        )
+
+        assert result['success'] is True
+        assert 'submission_id' in result
+        assert 'audit trail unavailable' in capsys.readouterr().err
+
+    def test_success_entry_uses_one_utc_format(self, contact_handler, valid_form,
+                                               monkeypatch):
+        """Test that the retention expiry uses the same Z-suffixed format as timestamps"""
+        logged = []
+        monkeypatch.setattr(contact_handler.AuditLogger, 'log_events_bulk',
+                            logged.extend)
+        handler = contact_handler.ContactFormHandler()
+
+        handler.process_submission(valid_form, '10.0.0.2', 'UA', 'a' * 32, 's')
+
+        success = next(e for e in logged if e['event_type'] == 'contact_form_success')
+        expiry = success['event_data']['data_retention_expiry']
+        assert expiry.endswith('Z') and '+00:00' not in expiry
+        datetime.strptime(expiry, '%Y-%m-%dT%H:%M:%S.%fZ')
+
+    def test_entries_are_stamped_when_events_happen(self, contact_handler, valid_form,
+                                                    monkeypatch):
+        """Test that deferred entries keep the time of their event, not of the write"""
+        ticks = iter(range(100))
+        monkeypatch.setattr(contact_handler, '_iso_now', lambda: f"{next(ticks):02d}")
+        stored_at = []
+        monkeypatch.setattr(contact_handler.ContactFormHandler, 'store_contact_data',
+                            lambda self, data: stored_at.append(contact_handler._iso_now()) or 'id')
+        logged = []
+        monkeypatch.setattr(contact_handler.AuditLogger, 'log_events_bulk', logged.extend)
+        handler = contact_handler.ContactFormHandler()
+
+        handler.process_submission(valid_form, '10.0.0.3', 'UA', 'a' * 32, 's')
+
+        stamps = {e['event_type']: e['timestamp'] for e in logged}
+        assert stamps['contact_form_attempt'] < stored_at[0] < stamps['contact_form_success']
+
+    def test_user_facing_ids_are_random_uuids(self, contact_handler, valid_form):
+        """Test that IDs returned to users are uuid4, not the audit counter"""
+        handler = contact_handler.ContactFormHandler()
+
+        ids = [
+            handler.process_submission(valid_form, '10.0.0.1', 'UA', 'a' * 32, 's')['submission_id'],
+            contact_handler.handle_data_export_request('john@example.com')['export_id'],
+            contact_handler.handle_data_deletion_request('john@example.com')['deletion_id']
+        ]
+
+        assert all(uuid.UUID(value).version == 4 for value in ids)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
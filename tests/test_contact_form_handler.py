@@ -0,0 +1,177 @@
+"""
+Test suite for contact form validation and rate limiting
+Following security and compliance requirements
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def form_fields():
+    """Valid contact form fields"""
+    return {
+        'name': 'John Doe',
+        'email': 'john@example.com',
+        'message': 'Hello there',
+        'timestamp': '2025-01-01T00:00:00.000000Z',
+        'consent_given': True,
+        'ip_address_hash': 'hash',
+        'user_agent': 'UA'
+    }
+
+
+class TestContactFormValidation:
+    """Test suite for ContactFormData validation"""
+
+    def test_uses_slots(self, contact_handler, form_fields):
+        """Test that instances carry no per-instance __dict__"""
+        contact_data = contact_handler.ContactFormData(**form_fields)
+
+        assert not hasattr(contact_data, '__dict__')
+        assert contact_data.email == 'john@example.com'
+
+    @pytest.mark.parametrize('message', [
+        'la condici\u00f3n = buena',
+        'onclick\u00e9=1',
+        'onclick\u00a0=1',
+        'on = off',
+    ])
+    def test_non_ascii_near_misses_are_accepted(self, contact_handler, form_fields, message):
+        """Test that the scan uses ASCII classes, so RE2 and re accept the same input"""
+        form_fields['message'] = message
+
+        contact_handler.ContactFormData(**form_fields)
+
+    @pytest.mark.parametrize('fields', [
+        {'name': 'Jo <', 'email': 'script@example.com'},
+        {'name': 'Sam Online', 'email': '=sam@example.com'},
+        {'email': 'jo@mail.java', 'message': 'script: notes'},
+        {'email': 'jo@example.data', 'message': ': notes'},
+    ])
+    def test_matches_do_not_span_fields(self, contact_handler, form_fields, fields):
+        """Test that the single scan never joins the end of one field to the next"""
+        form_fields.update(fields)
+
+        contact_handler.ContactFormData(**form_fields)
+
+    @pytest.mark.parametrize('message', [
+        '<script>alert(1)</script>',
+        'JavaScript:alert(1)',
+        'onclick=alert(1)',
+        'onload \t= x',
+        'data:text/html',
+    ])
+    def test_dangerous_content_is_rejected(self, contact_handler, form_fields, message):
+        """Test that dangerous content in the message is rejected"""
+        form_fields['message'] = message
+
+        with pytest.raises(ValueError, match='Invalid input detected'):
+            contact_handler.ContactFormData(**form_fields)
+
+
+class TestRateLimiting:
+    """Test suite for ContactFormHandler.check_rate_limit"""
+
+    @pytest.fixture
+    def clock(self, contact_handler, monkeypatch):
+        """Freeze the handler's clock; advance it by assigning clock.now_value"""
+        class FrozenDatetime(datetime):
+            now_value = datetime(2025, 1, 1, 12, 0, 0)
+
+            @classmethod
+            def utcnow(cls):
+                return cls.now_value
+
+        monkeypatch.setattr(contact_handler, 'datetime', FrozenDatetime)
+        return FrozenDatetime
+
+    @pytest.fixture
+    def handler(self, contact_handler):
+        """Fresh handler with an empty rate limiter"""
+        return contact_handler.ContactFormHandler()
+
+    def test_rejects_at_max_requests(self, handler, clock):
+        """Test that the request after max_requests is rejected and not recorded"""
+        assert all(handler.check_rate_limit('client', max_requests=3) for _ in range(3))
+
+        assert handler.check_rate_limit('client', max_requests=3) is False
+        assert len(handler.rate_limiter['client']) == 3
+
+    def test_requests_expire_at_window_boundary(self, handler, clock):
+        """Test that a request exactly one window old no longer counts"""
+        start = clock.now_value
+        for _ in range(5):
+            handler.check_rate_limit('client')
+
+        clock.now_value = start + timedelta(minutes=5) - timedelta(microseconds=1)
+        assert handler.check_rate_limit('client') is False
+
+        clock.now_value = start + timedelta(minutes=5)
+        assert handler.check_rate_limit('client') is True
+        assert list(handler.rate_limiter['client']) == [clock.now_value]
+
+    def test_seen_client_becomes_most_recent(self, handler, clock):
+        """Test that a returning client moves to the end of the LRU order"""
+        for client in ('a', 'b', 'c'):
+            handler.check_rate_limit(client)
+
+        handler.check_rate_limit('a')
+
+        assert list(handler.rate_limiter) == ['b', 'c', 'a']
+
+    def test_evicts_least_recent_client_past_limit(self, handler, clock):
+        """Test that tracking a new client past the limit drops the least recent one"""
+        handler.MAX_TRACKED_CLIENTS = 2
+        handler.check_rate_limit('a')
+        handler.check_rate_limit('b')
+        handler.check_rate_limit('a')
+
+        handler.check_rate_limit('c')
+
+        assert list(handler.rate_limiter) == ['a', 'c']
+
+
+class TestSubmissionChecks:
+    """Test suite for the order of checks in process_submission"""
+
+    @pytest.fixture
+    def logged(self, contact_handler, monkeypatch):
+        """Audit entries written by process_submission"""
+        entries = []
+        monkeypatch.setattr(contact_handler.AuditLogger, 'log_events_bulk', entries.extend)
+        return entries
+
+    @pytest.fixture
+    def form(self):
+        """Valid contact form submission"""
+        return {
+            'name': 'John Doe',
+            'email': 'john@example.com',
+            'message': 'Hello there',
+            'consent_given': True
+        }
+
+    def test_invalid_csrf_requests_count_toward_rate_limit(self, contact_handler,
+                                                           form, logged):
+        """Test that requests failing CSRF still use up the client's rate limit"""
+        handler = contact_handler.ContactFormHandler()
+        for _ in range(5):
+            handler.process_submission(form, '10.1.0.1', 'UA', 'bad', 's')
+
+        result = handler.process_submission(form, '10.1.0.1', 'UA', 'a' * 32, 's')
+
+        assert result['success'] is False
+        assert 'submission_id' not in result
+
+    def test_rate_limited_request_logs_no_attempt(self, contact_handler, form, logged):
+        """Test that a rejected request is audited as an error without an attempt event"""
+        handler = contact_handler.ContactFormHandler()
+        for _ in range(5):
+            handler.process_submission(form, '10.1.0.2', 'UA', 'a' * 32, 's')
+        del logged[:]
+
+        handler.process_submission(form, '10.1.0.2', 'UA', 'a' * 32, 's')
+
+        assert [e['event_type'] for e in logged] == ['contact_form_validation_error']